@@ -7,7 +7,7 @@ A Streamlit application for comparing two CSV datasets with flexible column mapp
 Packaging Instructions:
 ----------------------
 1. Install required packages:
-   pip install streamlit pandas pyinstaller
+   pip install streamlit pandas pyarrow pyinstaller
 
 2. Create executable:
    pyinstaller --onefile --add-data "streamlit:streamlit" dataset_comparison_app.py
@@ -23,11 +23,37 @@ Note: The executable will be created in the 'dist' directory.
 
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
 import io
-from typing import Dict, List, Tuple, Set
+from typing import Dict, List, Tuple
 import base64
+import gc
+import glob
+import html
 import os
 import sys
+import tempfile
+import time
+import uuid
+
+try:
+    import duckdb
+except ImportError:
+    # DuckDB is optional; without it every comparison uses the pandas anti-joins
+    duckdb = None
+
+# Combined row count above which comparisons are routed through DuckDB when it is installed
+DUCKDB_MIN_ROWS = 1_000_000
+
+# Bounds for the process-wide caches of parsed uploads and comparison masks; every upload gets a
+# new file_id, so unbounded caches would keep each parsed file in memory for the life of the server
+CACHE_MAX_ENTRIES = 16
+CACHE_TTL_SECONDS = 60 * 60
+
+# Spilled mismatched rows files older than this are assumed to belong to ended sessions
+SPILL_MAX_AGE_SECONDS = 24 * 60 * 60
 
 # Set page config
 st.set_page_config(
@@ -36,63 +62,230 @@ st.set_page_config(
     layout="wide"
 )
 
-def load_csv(uploaded_file) -> pd.DataFrame:
-    """Load CSV file into a pandas DataFrame."""
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def load_csv(file_id: str, _uploaded_file) -> pd.DataFrame:
+    """Load an uploaded CSV file into a pandas DataFrame, cached on its upload id."""
     try:
-        return pd.read_csv(uploaded_file)
+        try:
+            # Multithreaded Arrow parser with Arrow-backed (non-object) string columns
+            _uploaded_file.seek(0)
+            df = pd.read_csv(_uploaded_file, engine='pyarrow', dtype_backend='pyarrow')
+            # Columns empty in every row parse as null[pyarrow], which cannot be hashed, merged or
+            # sorted; read them as nullable doubles, like the C parser's all-NaN float columns
+            null_cols = [col for col, dtype in df.dtypes.items() if dtype == pd.ArrowDtype(pa.null())]
+            if null_cols:
+                df[null_cols] = df[null_cols].astype(pd.ArrowDtype(pa.float64()))
+            return df
+        except Exception:
+            # Fall back to the default C parser for files the Arrow parser rejects
+            _uploaded_file.seek(0)
+            return pd.read_csv(_uploaded_file)
     except Exception as e:
         st.error(f"Error loading CSV file: {str(e)}")
         return None
 
-def compare_datasets(df1: pd.DataFrame, df2: pd.DataFrame, column_mapping: Dict[str, str], left_filename: str, right_filename: str) -> Tuple[bool, pd.DataFrame]:
-    """Compare two datasets using the specified column mapping."""
-    try:
-        # Create copies to avoid modifying original dataframes
-        df1_copy = df1.copy()
-        df2_copy = df2.copy()
-        
-        # Rename columns in second dataframe according to mapping
-        df2_copy = df2_copy.rename(columns=column_mapping)
-        
-        # Perform merge
-        merged = pd.merge(
-            df1_copy,
-            df2_copy,
-            on=list(column_mapping.keys()),
-            how='outer',
-            indicator=True
-        )
-        
-        # Rename the _merge column to use actual filenames
-        merged = merged.rename(columns={'_merge': 'Dataset'})
-        merged['Dataset'] = merged['Dataset'].map({
-            'left_only': f'Only in {left_filename}',
-            'right_only': f'Only in {right_filename}',
-            'both': f'In both {left_filename} and {right_filename}'
-        })
-        
-        # Check if datasets are identical
-        is_identical = (
-            len(merged[merged['Dataset'] != f'In both {left_filename} and {right_filename}']) == 0 and
-            len(df1) == len(df2)
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def sorted_columns(file_id: str, _uploaded_file) -> List[str]:
+    """Get the sorted column names of an uploaded CSV file, cached on its upload id."""
+    return sorted(load_csv(file_id, _uploaded_file).columns.tolist())
+
+def _align_numeric_keys(keys: pd.DataFrame, other_keys: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Cast key columns that are numeric on both sides but of different dtypes to a common double dtype.
+
+    Arrow-backed int and double columns cannot be merged (1.5 fails to convert to int64), while the
+    C parser's int64 and float64 columns could, so mixed numeric keys are compared as doubles.
+    """
+    mixed_cols = [
+        col for col in keys.columns
+        if keys[col].dtype != other_keys[col].dtype and
+        all(
+            pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+            for dtype in (keys[col].dtype, other_keys[col].dtype)
         )
+    ]
+    if not mixed_cols:
+        return keys, other_keys
+    common = {col: pd.ArrowDtype(pa.float64()) for col in mixed_cols}
+    return keys.astype(common), other_keys.astype(common)
+
+def _normalise_float_keys(keys: pd.DataFrame) -> pd.DataFrame:
+    """Turn -0.0 into 0.0 in float key columns so equal values hash identically."""
+    float_cols = [col for col, dtype in keys.dtypes.items() if pd.api.types.is_float_dtype(dtype)]
+    if not float_cols:
+        return keys
+    normalised = keys.copy()
+    normalised[float_cols] = normalised[float_cols] + 0.0
+    return normalised
+
+def _anti_join_mask(keys: pd.DataFrame, other_keys: pd.DataFrame) -> np.ndarray:
+    """Return a boolean mask of the rows in keys that have no match in other_keys."""
+    # Row hashes are only comparable across frames whose key dtypes match, and object columns
+    # hash values like 1 and '1' alike even though a merge treats them as different
+    if keys.dtypes.equals(other_keys.dtypes) and not (keys.dtypes == object).any():
+        keys = _normalise_float_keys(keys)
+        other_keys = _normalise_float_keys(other_keys)
+        key_hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+        other_hashes = pd.util.hash_pandas_object(other_keys, index=False).to_numpy()
+        if len(other_hashes) == 0:
+            return np.ones(len(keys), dtype=bool)
+        order = np.argsort(other_hashes, kind='stable')
+        sorted_hashes = other_hashes[order]
+        positions = np.searchsorted(sorted_hashes, key_hashes).clip(max=len(sorted_hashes) - 1)
+        matched = sorted_hashes[positions] == key_hashes
         
-        # Get mismatched rows
-        mismatched = merged[merged['Dataset'] != f'In both {left_filename} and {right_filename}']
-        
-        return is_identical, mismatched
+        # Confirm hash hits against the candidate row's key values so a collision can never hide a mismatch
+        candidates = order[positions]
+        for col in keys.columns:
+            values = keys[col].reset_index(drop=True)
+            candidate_values = other_keys[col].iloc[candidates].reset_index(drop=True)
+            equal = (values == candidate_values).fillna(False) | (values.isna() & candidate_values.isna())
+            matched &= equal.to_numpy(dtype=bool)
+        return ~matched
     
-    except Exception as e:
-        st.error(f"Error comparing datasets: {str(e)}")
-        return False, pd.DataFrame()
+    # Mixed key dtypes (e.g. int against float) and object keys need a merge for exact value matching
+    merged = keys.merge(
+        other_keys.drop_duplicates(),
+        on=list(keys.columns),
+        how='left',
+        indicator=True,
+        validate='many_to_one'
+    )
+    return (merged['_merge'] == 'left_only').to_numpy()
 
-def get_matching_columns(left_cols: Set[str], right_cols: Set[str]) -> Tuple[Set[str], Set[str], Set[str]]:
+def _anti_join_masks_duckdb(left_keys: pd.DataFrame, right_keys: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the left-only and right-only row masks using DuckDB's out-of-core hash joins."""
+    # Register the keys under positional names so no user column can collide with the row id
+    names = [f"k{i}" for i in range(len(left_keys.columns))]
+    # Match missing keys to each other, as pandas merges do
+    condition = " AND ".join(f"a.{name} IS NOT DISTINCT FROM b.{name}" for name in names)
+    con = duckdb.connect()
+    try:
+        for table, keys in (('left_keys', left_keys), ('right_keys', right_keys)):
+            con.register(table, keys.set_axis(names, axis=1).reset_index(drop=True).assign(row_id=np.arange(len(keys))))
+        masks = []
+        for keys, this, other in ((left_keys, 'left_keys', 'right_keys'), (right_keys, 'right_keys', 'left_keys')):
+            rows = con.execute(
+                f"SELECT a.row_id FROM {this} a WHERE NOT EXISTS "
+                f"(SELECT 1 FROM {other} b WHERE {condition})"
+            ).fetchnumpy()['row_id']
+            mask = np.zeros(len(keys), dtype=bool)
+            mask[rows] = True
+            masks.append(mask)
+        return masks[0], masks[1]
+    finally:
+        con.close()
+
+def _keys_identical(keys: pd.DataFrame, other_keys: pd.DataFrame) -> bool:
+    """Cheaply check whether two equal-length key frames hold the same rows in the same order."""
+    key_hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    other_hashes = pd.util.hash_pandas_object(other_keys, index=False).to_numpy()
+    if not np.array_equal(key_hashes, other_hashes):
+        return False
+    # Confirm the hash match so a collision can never report a false positive
+    return keys.reset_index(drop=True).equals(other_keys.reset_index(drop=True))
+
+def find_mismatch_masks(df1: pd.DataFrame, df2: pd.DataFrame, column_mapping: Dict[str, str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Get boolean masks of the rows only in the left and only in the right dataset."""
+    # Project to key columns only so the merges never carry payload columns
+    keys = list(column_mapping.keys())
+    left_keys = df1[keys]
+    right_keys = df2[list(column_mapping.values())].set_axis(keys, axis=1)
+    left_keys, right_keys = _align_numeric_keys(left_keys, right_keys)
+    
+    if len(df1) == len(df2) and _keys_identical(left_keys, right_keys):
+        # Identical keys in the same order cannot produce any mismatches, so skip the joins
+        return np.zeros(len(df1), dtype=bool), np.zeros(len(df2), dtype=bool)
+    if (
+        duckdb is not None and
+        len(df1) + len(df2) >= DUCKDB_MIN_ROWS and
+        left_keys.dtypes.equals(right_keys.dtypes) and
+        not (left_keys.dtypes == object).any()
+    ):
+        # DuckDB startup only pays off on large inputs, and its implicit casts (1 = '1') only
+        # agree with pandas when both sides' key dtypes match exactly
+        return _anti_join_masks_duckdb(left_keys, right_keys)
+    return _anti_join_mask(left_keys, right_keys), _anti_join_mask(right_keys, left_keys)
+
+def build_comparison_result(df1: pd.DataFrame, df2: pd.DataFrame, column_mapping: Dict[str, str], masks: Tuple[np.ndarray, np.ndarray], left_filename: str, right_filename: str) -> Tuple[bool, pd.DataFrame]:
+    """Build the identical flag and labelled mismatched rows from the mismatch masks."""
+    left_only_mask, right_only_mask = masks
+    
+    # Check if datasets are identical
+    is_identical = (
+        not left_only_mask.any() and
+        not right_only_mask.any() and
+        len(df1) == len(df2)
+    )
+    
+    # Get mismatched rows, renaming only the selected right rows to their mapped left names
+    renames = {right: left for left, right in column_mapping.items()}
+    # Unmapped right columns that share a left column's name are suffixed, as a merge would, so
+    # column names stay unique and differently typed values never land in one column
+    renames.update({
+        col: f"{col}_right" for col in df2.columns
+        if col not in renames and (col in column_mapping or col in df1.columns)
+    })
+    left_rows = df1.loc[left_only_mask]
+    right_rows = df2.loc[right_only_mask].rename(columns=renames)
+    mismatched = pd.concat([left_rows, right_rows], ignore_index=True)
+    
+    # Label rows with a categorical so the column stores one small code per row
+    labels = [
+        f'Only in {left_filename}',
+        f'Only in {right_filename}',
+        f'In both {left_filename} and {right_filename}'
+    ]
+    categories = list(dict.fromkeys(labels))
+    codes = np.repeat(
+        [categories.index(labels[0]), categories.index(labels[1])],
+        [len(left_rows), len(right_rows)]
+    ).astype(np.int8)
+    mismatched['Dataset'] = pd.Categorical.from_codes(codes, categories=categories)
+    
+    return is_identical, mismatched
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def _compare_cached(left_id: str, right_id: str, mapping_items: Tuple[Tuple[str, str], ...], _left_file, _right_file) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the mismatch masks for two uploaded files, cached on their upload ids and the column mapping.
+
+    Only the masks are cached, not the mismatched rows, and errors propagate so a failed
+    comparison is retried on the next click instead of being replayed from the cache.
+    """
+    df1 = load_csv(left_id, _left_file)
+    df2 = load_csv(right_id, _right_file)
+    return find_mismatch_masks(df1, df2, dict(mapping_items))
+
+def get_matching_columns(left_cols: pd.Index, right_cols: pd.Index) -> Tuple[pd.Index, pd.Index, pd.Index]:
     """Get matching and non-matching columns between two datasets."""
-    matching = left_cols.intersection(right_cols)
-    left_only = left_cols - right_cols
-    right_only = right_cols - left_cols
+    matching = left_cols.intersection(right_cols, sort=False)
+    left_only = left_cols.difference(right_cols, sort=False)
+    right_only = right_cols.difference(left_cols, sort=False)
     return matching, left_only, right_only
 
+def remove_stale_mismatched() -> None:
+    """Delete spilled mismatched rows files left behind by sessions that have ended."""
+    cutoff = time.time() - SPILL_MAX_AGE_SECONDS
+    for path in glob.glob(os.path.join(tempfile.gettempdir(), "mismatched_*.parquet")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            # Another session may have removed it first
+            pass
+
+def save_mismatched(mismatched: pd.DataFrame, session_id: str) -> str:
+    """Spill mismatched rows to a per-session Parquet file and return its path."""
+    remove_stale_mismatched()
+    path = os.path.join(tempfile.gettempdir(), f"mismatched_{session_id}.parquet")
+    mismatched.to_parquet(path, compression='zstd', index=False)
+    return path
+
+def remove_mismatched(path: str) -> None:
+    """Delete a spilled mismatched rows file if it still exists."""
+    if os.path.exists(path):
+        os.remove(path)
+
+@st.cache_data(show_spinner=False)
 def get_base64_image(image_filename):
     # Get the absolute path to the image, works for PyInstaller
     if hasattr(sys, '_MEIPASS'):
@@ -103,6 +296,82 @@ def get_base64_image(image_filename):
     with open(image_path, "rb") as img_file:
         return base64.b64encode(img_file.read()).decode()
 
+@st.fragment
+def _results_panel():
+    """Render the stored comparison results and mismatched rows filter."""
+    # Check if we have comparison results in session state
+    if 'mismatched_path' in st.session_state and os.path.exists(st.session_state.mismatched_path):
+        if st.session_state.is_identical:
+            st.success("✅ Datasets are identical!")
+        else:
+            st.error(f"❌ Datasets are different! Found {st.session_state.mismatched_count} mismatched rows.")
+            
+            # Add filtering options using radio buttons
+            filter_option = st.radio(
+                "Filter mismatched rows:",
+                [
+                    "Show All",
+                    f"Only in {st.session_state.left_filename}",
+                    f"Only in {st.session_state.right_filename}",
+                    f"In both {st.session_state.left_filename} and {st.session_state.right_filename}"
+                ],
+                horizontal=True,
+                key="filter_option"
+            )
+            
+            try:
+                path = st.session_state.mismatched_path
+                
+                # Count from the Dataset column alone, then read only the first 50 matching rows
+                if filter_option == "Show All":
+                    filters = None
+                    filtered_count = st.session_state.mismatched_count
+                    preview = ds.dataset(path, format='parquet').head(50).to_pandas()
+                else:
+                    filters = [('Dataset', '==', filter_option)]
+                    labels = pd.read_parquet(path, columns=['Dataset'])['Dataset']
+                    # Compare the int8 category codes rather than the label strings
+                    code = labels.cat.categories.get_loc(filter_option)
+                    filtered_count = int((labels.cat.codes.to_numpy() == code).sum())
+                    preview = ds.dataset(path, format='parquet').head(
+                        50, filter=ds.field('Dataset') == filter_option
+                    ).to_pandas()
+                
+                # Show filtered mismatched rows preview with count
+                st.write(f"Preview of filtered mismatched rows ({filtered_count} rows, showing first 50):")
+                if filtered_count > 0:
+                    st.dataframe(preview)
+                else:
+                    st.info("No rows match the selected filter.")
+                
+                # Only load the full filtered rows and build download files on request; the download
+                # buttons don't rerun the app, so both stay available after the first download
+                if filtered_count > 0 and st.button("Prepare download", key="prepare_download"):
+                    filtered_mismatched = pd.read_parquet(path, filters=filters)
+                    
+                    # Write CSV in chunks straight into a bytes buffer
+                    csv_buffer = io.BytesIO()
+                    filtered_mismatched.to_csv(csv_buffer, index=False, chunksize=50_000)
+                    st.download_button(
+                        label="Download filtered mismatched rows as CSV",
+                        data=csv_buffer.getvalue(),
+                        file_name="mismatched_rows.csv",
+                        mime="text/csv",
+                        on_click="ignore"
+                    )
+                    # Parquet is columnar and much smaller/faster to produce for large results
+                    parquet_buffer = io.BytesIO()
+                    filtered_mismatched.to_parquet(parquet_buffer, index=False)
+                    st.download_button(
+                        label="Download filtered mismatched rows as Parquet",
+                        data=parquet_buffer.getvalue(),
+                        file_name="mismatched_rows.parquet",
+                        mime="application/octet-stream",
+                        on_click="ignore"
+                    )
+            except Exception as e:
+                st.error(f"Error during filtering: {str(e)}")
+
 def main():
     img_base64 = get_base64_image("db_equal.png")
     st.markdown(
@@ -128,14 +397,14 @@ def main():
     
     # Load datasets
     if left_file and right_file:
-        df_left = load_csv(left_file)
-        df_right = load_csv(right_file)
+        # Get filenames for display
+        left_filename = left_file.name.replace('.csv', '')
+        right_filename = right_file.name.replace('.csv', '')
+        
+        df_left = load_csv(left_file.file_id, left_file)
+        df_right = load_csv(right_file.file_id, right_file)
         
         if df_left is not None and df_right is not None:
-            # Get filenames for display
-            left_filename = left_file.name.replace('.csv', '')
-            right_filename = right_file.name.replace('.csv', '')
-            
             # Comparison type selection
             comparison_type = st.radio(
                 "Select comparison type:",
@@ -159,10 +428,14 @@ def main():
                     del st.session_state.selected_left_cols
                 if 'selected_right_cols' in st.session_state:
                     del st.session_state.selected_right_cols
-                if 'mismatched' in st.session_state:
-                    del st.session_state.mismatched
+                if 'mismatched_path' in st.session_state:
+                    remove_mismatched(st.session_state.mismatched_path)
+                    del st.session_state.mismatched_path
+                if 'mismatched_count' in st.session_state:
+                    del st.session_state.mismatched_count
                 if 'is_identical' in st.session_state:
                     del st.session_state.is_identical
+                gc.collect()
                 # Update previous comparison type
                 st.session_state.previous_comparison_type = comparison_type
                 st.rerun()
@@ -180,10 +453,19 @@ def main():
             if comparison_type == "All columns":
                 # Get matching and non-matching columns
                 matching_cols, left_only_cols, right_only_cols = get_matching_columns(
-                    set(df_left.columns),
-                    set(df_right.columns)
+                    df_left.columns,
+                    df_right.columns
                 )
                 
+                # Sort column lists once per rerun and reuse them in every widget
+                left_cols_sorted = sorted_columns(left_file.file_id, left_file)
+                right_cols_sorted = sorted_columns(right_file.file_id, right_file)
+                matching_cols_sorted = matching_cols.sort_values()
+                left_only_cols_sorted = left_only_cols.sort_values()
+                right_only_cols_sorted = right_only_cols.sort_values()
+                left_mapping_options = ["(No mapping)"] + left_cols_sorted
+                right_mapping_options = ["(No mapping)"] + right_cols_sorted
+                
                 # Initialize column mapping with matching columns if not already set
                 if not st.session_state.column_mapping:
                     st.session_state.column_mapping = {col: col for col in matching_cols}
@@ -193,53 +475,70 @@ def main():
                 st.write(f"Right dataset has {len(df_right.columns)} columns")
                 
                 # Show matching columns with option to override
-                if matching_cols:
+                if len(matching_cols) > 0:
                     # Create expander for automatic mappings (closed by default)
                     with st.expander(
                         f"✅ Automatically mapped columns ({len(matching_cols)})",
                         expanded=False
                     ):
-                        for col in sorted(matching_cols):
-                            st.divider()
-                            if col in st.session_state.removed_auto_columns:
-                                col1, col2, col3 = st.columns([2, 2, 1])
-                                with col1:
-                                    st.text_input("Left column", value=col, disabled=True, key=f"disabled_left_{col}")
-                                with col2:
-                                    right_val = st.session_state.column_mapping.get(col, "")
-                                    st.text_input("Right column", value=right_val, disabled=True, key=f"disabled_right_{col}")
-                                with col3:
-                                    if st.button("Add Back", key=f"add_back_auto_{col}"):
-                                        st.session_state.column_mapping[col] = col
-                                        st.session_state.removed_auto_columns.remove(col)
-                                        st.rerun()
-                                continue
-                            else:
-                                col1, col2, col3 = st.columns([2, 2, 1])
-                                with col1:
-                                    st.write(f"Left column: {col}")
-                                with col2:
-                                    st.write(f"Right column: {col}")
-                                    # Move the checkbox and selectbox below the column text
-                                    override = st.checkbox(
-                                        "Override mapping",
-                                        key=f"override_{col}"
-                                    )
-                                    if override:
-                                        right_col = st.selectbox(
-                                            "Map to right column:",
-                                            sorted(df_right.columns),
-                                            key=f"mapping_auto_{col}"
+                        # Reserve the table slot above the editing widgets; it is filled once mappings are final
+                        mapping_table = st.empty()
+                        
+                        # Only create the override/remove widgets when the user asks to edit
+                        if st.checkbox("Edit automatic mappings", key="edit_auto_mappings"):
+                            for col in matching_cols_sorted:
+                                st.divider()
+                                if col in st.session_state.removed_auto_columns:
+                                    col1, col2, col3 = st.columns([2, 2, 1])
+                                    with col1:
+                                        st.text_input("Left column", value=col, disabled=True, key=f"disabled_left_{col}")
+                                    with col2:
+                                        right_val = st.session_state.column_mapping.get(col, "")
+                                        st.text_input("Right column", value=right_val, disabled=True, key=f"disabled_right_{col}")
+                                    with col3:
+                                        if st.button("Add Back", key=f"add_back_auto_{col}"):
+                                            st.session_state.column_mapping[col] = col
+                                            st.session_state.removed_auto_columns.remove(col)
+                                            st.rerun()
+                                    continue
+                                else:
+                                    col1, col2, col3 = st.columns([2, 2, 1])
+                                    with col1:
+                                        st.write(f"Left column: {col}")
+                                    with col2:
+                                        st.write(f"Right column: {col}")
+                                        # Move the checkbox and selectbox below the column text
+                                        override = st.checkbox(
+                                            "Override mapping",
+                                            key=f"override_{col}"
                                         )
-                                        st.session_state.column_mapping[col] = right_col
-                                with col3:
-                                    if st.button("Remove", key=f"remove_auto_{col}"):
-                                        st.session_state.column_mapping.pop(col, None)
-                                        st.session_state.removed_auto_columns.add(col)
-                                        st.rerun()
+                                        if override:
+                                            right_col = st.selectbox(
+                                                "Map to right column:",
+                                                right_cols_sorted,
+                                                key=f"mapping_auto_{col}"
+                                            )
+                                            st.session_state.column_mapping[col] = right_col
+                                    with col3:
+                                        if st.button("Remove", key=f"remove_auto_{col}"):
+                                            st.session_state.column_mapping.pop(col, None)
+                                            st.session_state.removed_auto_columns.add(col)
+                                            st.rerun()
+                        
+                        # Render all mappings as one read-only table instead of a widget row per column
+                        table_rows = "".join(
+                            f"<tr><td>{html.escape(str(col))}</td>"
+                            f"<td>{html.escape(str(st.session_state.column_mapping.get(col, '')))}</td>"
+                            f"<td>{'Removed' if col in st.session_state.removed_auto_columns else 'Mapped'}</td></tr>"
+                            for col in matching_cols_sorted
+                        )
+                        mapping_table.markdown(
+                            f"<table><tr><th>Left column</th><th>Right column</th><th>Status</th></tr>{table_rows}</table>",
+                            unsafe_allow_html=True
+                        )
                 
                 # Show and handle non-matching columns
-                if left_only_cols or right_only_cols:
+                if len(left_only_cols) > 0 or len(right_only_cols) > 0:
                     st.warning("⚠️ Some columns don't match exactly. Please review the mapping:")
                     
                     # Create a container for manual mapping
@@ -247,9 +546,9 @@ def main():
                     
                     with mapping_container:
                         # Show left-only columns
-                        if left_only_cols:
+                        if len(left_only_cols) > 0:
                             st.write("Columns in left dataset only:")
-                            for left_col in sorted(left_only_cols):
+                            for left_col in left_only_cols_sorted:
                                 if left_col not in st.session_state.removed_review_columns:
                                     st.divider()  # Add divider before each mapping
                                     col1, col2, col3 = st.columns([2, 2, 1])
@@ -258,7 +557,7 @@ def main():
                                     with col2:
                                         right_col = st.selectbox(
                                             f"Map to right column:",
-                                            ["(No mapping)"] + sorted(df_right.columns),
+                                            right_mapping_options,
                                             key=f"mapping_left_{left_col}"
                                         )
                                         if right_col != "(No mapping)":
@@ -272,16 +571,16 @@ def main():
                                             st.rerun()
                         
                         # Show right-only columns
-                        if right_only_cols:
+                        if len(right_only_cols) > 0:
                             st.write("Columns in right dataset only:")
-                            for right_col in sorted(right_only_cols):
+                            for right_col in right_only_cols_sorted:
                                 if right_col not in st.session_state.removed_review_columns:
                                     st.divider()  # Add divider before each mapping
                                     col1, col2, col3 = st.columns([2, 2, 1])
                                     with col1:
                                         left_col = st.selectbox(
                                             f"Map to left column:",
-                                            ["(No mapping)"] + sorted(df_left.columns),
+                                            left_mapping_options,
                                             key=f"mapping_right_{right_col}"
                                         )
                                         with col2:
@@ -389,66 +688,43 @@ def main():
             # Perform comparison if mapping is complete
             if st.session_state.column_mapping:
                 if st.button("Compare Datasets"):
-                    is_identical, mismatched = compare_datasets(
-                        df_left,
-                        df_right,
-                        st.session_state.column_mapping,
-                        left_filename,
-                        right_filename
-                    )
-                    # Store results in session state
-                    st.session_state.is_identical = is_identical
-                    st.session_state.mismatched = mismatched
-                    st.session_state.left_filename = left_filename
-                    st.session_state.right_filename = right_filename
-                
-                # Check if we have comparison results in session state
-                if 'mismatched' in st.session_state and st.session_state.mismatched is not None:
-                    if st.session_state.is_identical:
-                        st.success("✅ Datasets are identical!")
-                    else:
-                        st.error(f"❌ Datasets are different! Found {len(st.session_state.mismatched)} mismatched rows.")
-                        
-                        # Add filtering options using radio buttons
-                        filter_option = st.radio(
-                            "Filter mismatched rows:",
-                            [
-                                "Show All",
-                                f"Only in {st.session_state.left_filename}",
-                                f"Only in {st.session_state.right_filename}",
-                                f"In both {st.session_state.left_filename} and {st.session_state.right_filename}"
-                            ],
-                            horizontal=True,
-                            key="filter_option"
+                    try:
+                        masks = _compare_cached(
+                            left_file.file_id,
+                            right_file.file_id,
+                            tuple(sorted(st.session_state.column_mapping.items())),
+                            left_file,
+                            right_file
                         )
-                        
-                        try:
-                            # Apply filter based on selection
-                            if filter_option == "Show All":
-                                filtered_mismatched = st.session_state.mismatched.copy()
-                            else:
-                                filtered_mismatched = st.session_state.mismatched[
-                                    st.session_state.mismatched['Dataset'] == filter_option
-                                ].copy()
-                            
-                            # Show filtered mismatched rows preview with count
-                            st.write(f"Preview of filtered mismatched rows ({len(filtered_mismatched)} rows, showing first 50):")
-                            if len(filtered_mismatched) > 0:
-                                st.dataframe(filtered_mismatched.head(50))
-                            else:
-                                st.info("No rows match the selected filter.")
-                            
-                            # Download button for filtered mismatched rows
-                            if len(filtered_mismatched) > 0:
-                                csv = filtered_mismatched.to_csv(index=False)
-                                st.download_button(
-                                    label="Download filtered mismatched rows as CSV",
-                                    data=csv,
-                                    file_name="mismatched_rows.csv",
-                                    mime="text/csv"
-                                )
-                        except Exception as e:
-                            st.error(f"Error during filtering: {str(e)}")
+                        is_identical, mismatched = build_comparison_result(
+                            df_left,
+                            df_right,
+                            st.session_state.column_mapping,
+                            masks,
+                            left_filename,
+                            right_filename
+                        )
+                        # Spill the rows to disk, replacing the previous comparison's file
+                        if 'mismatched_path' in st.session_state:
+                            remove_mismatched(st.session_state.mismatched_path)
+                        if 'session_id' not in st.session_state:
+                            st.session_state.session_id = uuid.uuid4().hex
+                        mismatched_path = save_mismatched(mismatched, st.session_state.session_id)
+                    except Exception as e:
+                        st.error(f"Error comparing datasets: {str(e)}")
+                    else:
+                        # Store results in session state, keeping only a path to the spilled rows
+                        st.session_state.is_identical = is_identical
+                        st.session_state.mismatched_path = mismatched_path
+                        st.session_state.mismatched_count = len(mismatched)
+                        # The rows now live on disk, so release the in-memory frame straight away
+                        del mismatched
+                        gc.collect()
+                        st.session_state.left_filename = left_filename
+                        st.session_state.right_filename = right_filename
+                
+                # Show results in a fragment so filtering does not rerun the whole page
+                _results_panel()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,146 @@
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+import dataset_comparison_app
+
+from dataset_comparison_app import (
+    SPILL_MAX_AGE_SECONDS,
+    build_comparison_result,
+    find_mismatch_masks,
+    load_csv,
+    save_mismatched,
+)
+
+
+def compare(df1, df2, column_mapping, left_filename, right_filename):
+    """Run a comparison the way main() does, without the Streamlit caching."""
+    masks = find_mismatch_masks(df1, df2, column_mapping)
+    return build_comparison_result(df1, df2, column_mapping, masks, left_filename, right_filename)
+
+
+def test_all_empty_column_compares():
+    """A column that is empty in every row must not break the comparison."""
+    df_left = load_csv("empty_note_left", io.BytesIO(b"id,note\n1,\n2,\n3,\n"))
+    df_right = load_csv("empty_note_right", io.BytesIO(b"id,note\n3,\n1,\n4,\n"))
+
+    is_identical, mismatched = compare(
+        df_left, df_right, {"id": "id", "note": "note"}, "left", "right"
+    )
+
+    assert not is_identical
+    assert len(mismatched) == 2
+    assert sorted(mismatched["id"].tolist()) == [2, 4]
+
+
+def test_signed_zero_keys_match():
+    """0.0 and -0.0 are the same key, as they are for a merge."""
+    df_left = pd.DataFrame({"k": [0.0, 1.0]})
+    df_right = pd.DataFrame({"k": [-0.0, 1.0]})
+
+    is_identical, mismatched = compare(df_left, df_right, {"k": "k"}, "left", "right")
+
+    assert is_identical
+    assert mismatched.empty
+
+
+def test_object_keys_do_not_match_across_types():
+    """1 and '1' in object columns are different keys, as they are for a merge."""
+    df_left = pd.DataFrame({"k": pd.Series([1, 2], dtype=object)})
+    df_right = pd.DataFrame({"k": pd.Series(["1", 2], dtype=object)})
+
+    is_identical, mismatched = compare(df_left, df_right, {"k": "k"}, "left", "right")
+
+    assert not is_identical
+    assert mismatched["k"].tolist() == [1, "1"]
+
+
+def test_unmapped_right_column_sharing_a_mapped_name():
+    """An unmapped right column named like a mapped left column must not collide after renaming."""
+    df_left = pd.DataFrame({"a": [1, 2]})
+    df_right = pd.DataFrame({"a": [9, 9], "d": [1, 3]})
+
+    is_identical, mismatched = compare(df_left, df_right, {"a": "d"}, "left", "right")
+
+    assert not is_identical
+    assert list(mismatched.columns) == ["a", "a_right", "Dataset"]
+    assert mismatched["a"].tolist() == [2, 3]
+
+
+def test_int_and_float_keys_compare_by_value():
+    """Integer keys on one side and float keys on the other are compared by value."""
+    df_left = load_csv("int_keys_left", io.BytesIO(b"k\n1\n2\n"))
+    df_right = load_csv("float_keys_right", io.BytesIO(b"k\n1.0\n1.5\n"))
+
+    is_identical, mismatched = compare(df_left, df_right, {"k": "k"}, "left", "right")
+
+    assert not is_identical
+    assert mismatched["k"].tolist() == [2, 1.5]
+
+
+def test_unmapped_columns_with_conflicting_types_stay_separate(tmp_path):
+    """An unmapped column shared by both sides keeps each side's values apart and can be spilled."""
+    df_left = load_csv("amount_left", io.BytesIO(b"id,amount\n1,10\n2,20\n"))
+    df_right = load_csv("amount_right", io.BytesIO(b"id,amount\n1,N/A x\n3,N/A x\n"))
+
+    is_identical, mismatched = compare(df_left, df_right, {"id": "id"}, "left", "right")
+
+    assert not is_identical
+    assert list(mismatched.columns) == ["id", "amount", "amount_right", "Dataset"]
+    mismatched.to_parquet(tmp_path / "mismatched.parquet")
+
+
+def test_save_mismatched_sweeps_stale_spills(tmp_path, monkeypatch):
+    """Saving removes spilled files from ended sessions but keeps recent ones."""
+    monkeypatch.setattr(tempfile, "gettempdir", lambda: str(tmp_path))
+    stale = tmp_path / "mismatched_stale.parquet"
+    recent = tmp_path / "mismatched_recent.parquet"
+    stale.write_bytes(b"")
+    recent.write_bytes(b"")
+    old = time.time() - SPILL_MAX_AGE_SECONDS - 60
+    os.utime(stale, (old, old))
+
+    path = save_mismatched(pd.DataFrame({"k": [1]}), "current")
+
+    assert not stale.exists()
+    assert recent.exists()
+    assert os.path.exists(path)
+
+
+@pytest.mark.parametrize(
+    "df_left, df_right",
+    [
+        (pd.DataFrame({"k": [1, 2, 3]}), pd.DataFrame({"k": [1, 3]})),
+        (pd.DataFrame({"__row": [1, 2]}), pd.DataFrame({"__row": [1, 3, 3]})),
+        (pd.DataFrame({"k": [1.0, None, -0.0]}), pd.DataFrame({"k": [None, 0.0]})),
+        (pd.DataFrame({"a": [1, 2], "b": ["x", None]}), pd.DataFrame({"a": [1, 2, 2], "b": ["x", "y", None]})),
+        (pd.DataFrame({"k": [1, 2]}), pd.DataFrame({"k": ["1", "2", "3"]}, dtype=object)),
+    ],
+)
+def test_duckdb_masks_match_pandas(df_left, df_right, monkeypatch):
+    """The DuckDB route must find exactly the mismatches the pandas route finds."""
+    pytest.importorskip("duckdb")
+    mapping = {col: col for col in df_left.columns}
+
+    def masks_or_error():
+        try:
+            return find_mismatch_masks(df_left, df_right, mapping)
+        except Exception as e:
+            return type(e)
+
+    monkeypatch.setattr(dataset_comparison_app, "DUCKDB_MIN_ROWS", float("inf"))
+    expected = masks_or_error()
+    monkeypatch.setattr(dataset_comparison_app, "DUCKDB_MIN_ROWS", 0)
+    actual = masks_or_error()
+
+    if isinstance(expected, tuple):
+        assert [mask.tolist() for mask in actual] == [mask.tolist() for mask in expected]
+    else:
+        assert actual is expected